@@ -0,0 +1,75 @@
+# alloc_profile.py
+# 추적 루프의 프레임당 메모리 할당 회귀 검사 – 녹화 프레임으로 GuitarTracker를 돌리고
+# 단계별 할당량이 config.ALLOC_BUDGETS를 넘으면 exit code 1로 종료합니다 (CI에서 사용).
+#
+#   python alloc_profile.py --corpus uploaded_images --frames 100
+import os
+import sys
+import json
+import glob
+import argparse
+import cv2
+from config import ALLOC_BUDGETS
+from alloc_profiler import AllocProfiler, check_budgets
+from inference import GuitarTracker
+
+def load_frames(path: str) -> list:
+    files = sorted(glob.glob(os.path.join(path, "*.jpg")) + glob.glob(os.path.join(path, "*.jpeg")))
+    frames = [cv2.imread(fp, cv2.IMREAD_COLOR) for fp in files]
+    return [f for f in frames if f is not None]
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="GuitarTracker 프레임당 할당 프로파일링")
+    parser.add_argument("--corpus", default="uploaded_images", help="녹화 프레임(jpg) 디렉터리")
+    parser.add_argument("--frames", type=int, default=100, help="측정 프레임 수 (코퍼스 반복)")
+    parser.add_argument("--warmup", type=int, default=10, help="측정 전 워밍업 프레임 수")
+    parser.add_argument("--output", default=None, help="결과 JSON 저장 경로")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    frames = load_frames(args.corpus)
+    if not frames:
+        print(f"프레임 코퍼스가 비어 있습니다: {args.corpus}")
+        return 1
+
+    tracker = GuitarTracker()
+    # 모델 로딩/첫 추론의 일회성 할당은 측정에서 제외
+    for i in range(args.warmup):
+        tracker.process_frame(frames[i % len(frames)])
+
+    profiler = AllocProfiler()
+    tracker.profiler = profiler
+    profiler.start()
+    try:
+        for i in range(args.frames):
+            tracker.process_frame(frames[i % len(frames)])
+    finally:
+        profiler.stop()
+        tracker.close()
+
+    summary = profiler.summary()
+    print(f"{'stage':>10} {'frames':>7} {'mean_peak_KB':>13} {'max_peak_KB':>12} {'budget_KB':>10} {'objects':>8}")
+    for stage, stat in summary.items():
+        budget = ALLOC_BUDGETS.get(stage)
+        print(f"{stage:>10} {stat['frames']:>7} {stat['mean_peak_bytes']/1024:13.1f} "
+              f"{stat['max_peak_bytes']/1024:12.1f} {(budget/1024 if budget else 0):10.0f} "
+              f"{stat['mean_net_objects']:8.1f}")
+    rss = [f["rss"] for f in profiler.frames if f.get("rss")]
+    if rss:
+        print(f"RSS: start {rss[0]/2**20:.1f}MB → end {rss[-1]/2**20:.1f}MB")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"summary": summary, "frames": profiler.frames}, f, indent=2)
+
+    violations = check_budgets(summary, ALLOC_BUDGETS)
+    for stage, used, budget in violations:
+        if used is None:
+            print(f"❌ {stage} 단계가 측정되지 않았습니다 (코퍼스가 검출/추적 단계까지 진행되는지 확인)")
+        else:
+            print(f"❌ {stage} 단계 할당 초과: {used/1024:.1f}KB > {budget/1024:.0f}KB")
+    return 1 if violations else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
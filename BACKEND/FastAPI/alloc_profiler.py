@@ -0,0 +1,101 @@
+# alloc_profiler.py
+import os
+import tracemalloc
+from collections import defaultdict
+
+def read_rss_bytes(pid: int = None):
+    try:
+        with open(f"/proc/{pid or os.getpid()}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        return None
+    return None
+
+class AllocProfiler:
+    """GuitarTracker 프로파일링 모드 – 프레임마다 단계별 할당량을 기록.
+    checkpoint(stage)는 직전 checkpoint 이후의 할당을 해당 단계로 집계한다.
+      - peak_bytes : 단계 중 최대 추가 사용량 (일시적 임시 배열 포함)
+      - net_bytes / net_objects : 단계 종료 시점까지 남아 있는 증가분
+    tracemalloc은 프로세스 전역이므로 process_frame(단일 스레드) 경로에서만 사용."""
+
+    def __init__(self):
+        self._filters = [
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+        ]
+        self.frames = []  # 프레임별 {stage: {...}, "rss": bytes}
+        self._current = None
+        self._last_snapshot = None
+        self._last_traced = 0
+
+    def start(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def stop(self):
+        tracemalloc.stop()
+
+    def _snapshot(self):
+        return tracemalloc.take_snapshot().filter_traces(self._filters)
+
+    def start_frame(self):
+        self._current = {}
+        self._last_snapshot = self._snapshot()
+        self._last_traced = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+
+    def checkpoint(self, stage: str):
+        if self._current is None:
+            return
+        _, peak = tracemalloc.get_traced_memory()
+        snapshot = self._snapshot()
+        stats = snapshot.compare_to(self._last_snapshot, "filename")
+        self._current[stage] = {
+            "peak_bytes": max(peak - self._last_traced, 0),
+            "net_bytes": sum(s.size_diff for s in stats if s.size_diff > 0),
+            "net_objects": sum(s.count_diff for s in stats if s.count_diff > 0),
+        }
+        self._last_snapshot = snapshot
+        # 스냅샷 자체가 차지하는 메모리는 다음 단계에 포함되지 않도록 다시 기준을 잡음
+        self._last_traced = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+
+    def end_frame(self):
+        if self._current is None:
+            return
+        self._current["rss"] = read_rss_bytes()
+        self.frames.append(self._current)
+        self._current = None
+        self._last_snapshot = None
+
+    def summary(self) -> dict:
+        # 단계별 평균/최대
+        per_stage = defaultdict(list)
+        for frame in self.frames:
+            for stage, stat in frame.items():
+                if stage != "rss":
+                    per_stage[stage].append(stat)
+        out = {}
+        for stage, stats in per_stage.items():
+            out[stage] = {
+                "frames": len(stats),
+                "mean_peak_bytes": sum(s["peak_bytes"] for s in stats) / len(stats),
+                "max_peak_bytes": max(s["peak_bytes"] for s in stats),
+                "mean_net_objects": sum(s["net_objects"] for s in stats) / len(stats),
+                "max_net_bytes": max(s["net_bytes"] for s in stats),
+            }
+        return out
+
+def check_budgets(summary: dict, budgets: dict) -> list:
+    # 예산을 넘은 단계 목록 [(stage, max_peak_bytes, budget)]
+    # 예산이 있는데 한 번도 측정되지 않은 단계(코퍼스가 추적 모드에 들어가지 못한 경우 등)는 max_peak_bytes=None
+    violations = []
+    for stage, budget in budgets.items():
+        stat = summary.get(stage)
+        if not stat:
+            violations.append((stage, None, budget))
+        elif stat["max_peak_bytes"] > budget:
+            violations.append((stage, stat["max_peak_bytes"], budget))
+    return violations
@@ -0,0 +1,54 @@
+# burst_parser.py
+# /ai/tracking 단일 본문 버스트 파싱 – 본문을 복사하지 않고 프레임별 memoryview 조각으로 분리
+import struct
+from config import BURST_LENGTH_PREFIXED_TYPE, BURST_MJPEG_TYPES, MAX_BURST_FRAMES
+
+LENGTH_PREFIX = struct.Struct(">I")
+JPEG_SOI = b"\xff\xd8\xff"
+JPEG_EOI = b"\xff\xd9"
+
+def split_length_prefixed(data: bytes) -> list:
+    view = memoryview(data)
+    frames = []
+    pos = 0
+    while pos < len(data):
+        if pos + LENGTH_PREFIX.size > len(data):
+            raise ValueError("Truncated length prefix")
+        (length,) = LENGTH_PREFIX.unpack_from(data, pos)
+        pos += LENGTH_PREFIX.size
+        if length == 0 or pos + length > len(data):
+            raise ValueError("Invalid frame length")
+        frames.append(view[pos:pos + length])
+        pos += length
+    return frames
+
+def split_mjpeg(data: bytes) -> list:
+    """연속된 JPEG(또는 multipart/x-mixed-replace 본문)을 SOI/EOI 마커로 분리.
+    각 프레임은 다음 SOI 직전의 마지막 EOI까지로 본다 (파트 헤더/경계 문자열은 건너뜀).
+    EXIF 썸네일이 포함된 JPEG는 지원하지 않음 – 클라이언트 Bitmap.compress 출력 기준."""
+    view = memoryview(data)
+    frames = []
+    start = data.find(JPEG_SOI)
+    while start != -1:
+        next_start = data.find(JPEG_SOI, start + len(JPEG_SOI))
+        limit = next_start if next_start != -1 else len(data)
+        end = data.rfind(JPEG_EOI, start, limit)
+        if end == -1:
+            raise ValueError("Missing JPEG end marker")
+        frames.append(view[start:end + len(JPEG_EOI)])
+        start = next_start
+    return frames
+
+def split_burst(data: bytes, content_type: str) -> list:
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    if media_type == BURST_LENGTH_PREFIXED_TYPE:
+        frames = split_length_prefixed(data)
+    elif media_type in BURST_MJPEG_TYPES:
+        frames = split_mjpeg(data)
+    else:
+        raise ValueError(f"Unsupported burst content type: {media_type}")
+    if not frames:
+        raise ValueError("Empty burst")
+    if len(frames) > MAX_BURST_FRAMES:
+        raise ValueError("Too many frames in burst")
+    return frames
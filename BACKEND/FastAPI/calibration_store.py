@@ -0,0 +1,79 @@
+# calibration_store.py
+import os
+import json
+import hashlib
+import logging
+from config import CALIBRATION_DIR
+
+logger = logging.getLogger(__name__)
+
+# device_token -> 캘리브레이션 스냅샷 (메모리 캐시, 파일로도 영속화)
+CALIBRATION_DATA = {}
+
+def _calibration_path(device_token: str) -> str:
+    # 클라이언트가 보낸 토큰을 그대로 파일명으로 쓰지 않도록 해시 처리
+    digest = hashlib.sha1(device_token.encode("utf-8")).hexdigest()
+    return os.path.join(CALIBRATION_DIR, f"{digest}.json")
+
+def _point_to_list(pt):
+    return [float(pt[0]), float(pt[1])]
+
+def _serialize(snapshot: dict) -> dict:
+    return {
+        "init_corners": [
+            None if c is None else [_point_to_list(c[0]), _point_to_list(c[1])]
+            for c in snapshot["init_corners"]
+        ],
+        "fret_geometry": [
+            None if g is None else {
+                "dist_from_nut": float(g["dist_from_nut"]),
+                "angle_from_nut": float(g["angle_from_nut"]),
+            }
+            for g in snapshot["fret_geometry"]
+        ],
+        "nut_box": None if snapshot["nut_box"] is None else [int(v) for v in snapshot["nut_box"]],
+        "far_fret_box": None if snapshot["far_fret_box"] is None else [int(v) for v in snapshot["far_fret_box"]],
+        "predicted_frets": [int(i) for i in snapshot["predicted_frets"]],
+    }
+
+def _deserialize(data: dict) -> dict:
+    return {
+        "init_corners": [
+            None if c is None else (tuple(c[0]), tuple(c[1]))
+            for c in data["init_corners"]
+        ],
+        "fret_geometry": data["fret_geometry"],
+        "nut_box": None if data["nut_box"] is None else tuple(data["nut_box"]),
+        "far_fret_box": None if data["far_fret_box"] is None else tuple(data["far_fret_box"]),
+        # 예측 프렛 목록이 없던 이전 형식은 전부 관측된 캘리브레이션
+        "predicted_frets": data.get("predicted_frets", []),
+    }
+
+def save_calibration(device_token: str, snapshot: dict) -> None:
+    if not device_token or snapshot is None:
+        return
+    data = _serialize(snapshot)
+    CALIBRATION_DATA[device_token] = data
+    try:
+        os.makedirs(CALIBRATION_DIR, exist_ok=True)
+        with open(_calibration_path(device_token), "w") as f:
+            json.dump(data, f)
+    except OSError:
+        logger.exception("캘리브레이션 저장 실패")
+
+def load_calibration(device_token: str):
+    if not device_token:
+        return None
+    data = CALIBRATION_DATA.get(device_token)
+    if data is None:
+        path = _calibration_path(device_token)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            logger.exception("캘리브레이션 로드 실패")
+            return None
+        CALIBRATION_DATA[device_token] = data
+    return _deserialize(data)
@@ -0,0 +1,95 @@
+# chord_matcher.py
+from itertools import combinations, product
+from config import CHORD_OPTIONAL_FINGERS, CHORD_CONFIDENT_FRAMES
+
+# 코드 운지표 (DB chord_data와 동일) – {finger: (fret, (허용 string, ...))}
+# 바레 코드처럼 한 손가락이 여러 줄을 누르는 경우 손끝은 그 중 한 줄에 위치
+CHORD_SHAPES = {
+    "G": {1: (2, (5,)), 2: (3, (6,)), 3: (3, (1,))},
+    "D": {1: (2, (3,)), 2: (2, (1,)), 3: (3, (2,))},
+    "Em": {2: (2, (5,)), 3: (2, (4,))},
+    "C": {1: (1, (2,)), 2: (2, (4,)), 3: (3, (5,))},
+    "A": {1: (2, (4,)), 2: (2, (3,)), 3: (2, (2,))},
+    "E": {1: (1, (3,)), 2: (2, (5,)), 3: (2, (4,))},
+    "Am": {1: (1, (2,)), 2: (2, (4,)), 3: (2, (3,))},
+    "Dm": {1: (1, (1,)), 2: (2, (3,)), 3: (3, (2,))},
+    "F": {1: (1, (1, 2, 3, 4, 5, 6)), 2: (2, (3,)), 3: (3, (5,)), 4: (3, (4,))},
+    "Bm": {1: (2, (1, 2, 3, 4, 5)), 2: (3, (2,)), 3: (4, (4,)), 4: (4, (3,))},
+    "E7": {1: (1, (3,)), 2: (2, (5,))},
+    "A7": {1: (2, (4,)), 2: (2, (2,))},
+    "B7": {1: (1, (4,)), 2: (2, (5,)), 3: (2, (3,)), 4: (2, (1,))},
+    "D7": {1: (1, (2,)), 2: (2, (3,)), 3: (2, (1,))},
+    "C7": {1: (1, (1,)), 2: (2, (4,)), 3: (3, (5,))},
+    "G7": {1: (1, (1,)), 2: (2, (5,)), 3: (3, (6,))},
+    "F#m": {1: (2, (1, 2, 3, 4, 5, 6)), 3: (4, (5,)), 4: (4, (4,))},
+    "C#m": {1: (4, (1, 2, 3, 4, 5)), 3: (6, (4,)), 4: (6, (3,))},
+    "Bm7": {1: (2, (1, 2, 3, 4, 5)), 3: (2, (5,))},
+    "F#m7": {1: (2, (1, 2, 3, 4, 5, 6)), 3: (2, (5,))},
+    "Em7": {2: (2, (5,)), 3: (2, (4,))},
+    "Am7": {1: (1, (2,)), 2: (2, (4,))},
+    "Dsus4": {1: (2, (3,)), 2: (3, (1,)), 3: (3, (2,))},
+    "Asus4": {1: (2, (4,)), 2: (2, (3,)), 3: (3, (2,))},
+    "Cadd9": {1: (2, (4,)), 2: (3, (5,)), 3: (3, (2,)), 4: (3, (1,))},
+    "Gadd9": {1: (2, (3,)), 2: (2, (5,)), 3: (3, (6,)), 4: (3, (1,))},
+    "Fmaj7": {1: (1, (2,)), 2: (2, (3,)), 3: (3, (4,))},
+    "Emaj7": {1: (1, (1, 3)), 3: (2, (5,)), 4: (2, (4,))},
+    "C#m7": {1: (4, (1, 2, 3, 4, 5)), 2: (5, (2,)), 3: (6, (4,))},
+    "G#m7": {1: (4, (1, 2, 3, 4, 5, 6)), 3: (4, (5,))},
+}
+
+def build_chord_index(shapes: dict) -> dict:
+    """(finger, string, fret) 집합 -> 코드 이름 집합 인덱스.
+    3손가락 이상 코드는 CHORD_OPTIONAL_FINGERS개까지 손가락이 빠진 부분집합도 등록."""
+    index = {}
+    for name, shape in shapes.items():
+        fingers = sorted(shape.keys())
+        max_drop = CHORD_OPTIONAL_FINGERS if len(fingers) >= 3 else 0
+        for drop in range(max_drop + 1):
+            for kept in combinations(fingers, len(fingers) - drop):
+                choices = [[(f, s, shape[f][0]) for s in shape[f][1]] for f in kept]
+                for combo in product(*choices):
+                    index.setdefault(frozenset(combo), set()).add(name)
+    return index
+
+CHORD_INDEX = build_chord_index(CHORD_SHAPES)
+
+def _observed_key(shape: dict, finger_positions: dict) -> frozenset:
+    key = []
+    for finger in shape:
+        pos = finger_positions.get(finger) or {}
+        if pos.get("fretboard") is None or pos.get("string") is None:
+            continue
+        key.append((finger, pos["string"], pos["fretboard"]))
+    return frozenset(key)
+
+def finger_errors(shape: dict, finger_positions: dict) -> dict:
+    # 손가락별 오차 (실제 - 기대). 인식되지 않은 값은 None
+    errors = {}
+    for finger, (fret, strings) in shape.items():
+        pos = finger_positions.get(finger) or {}
+        fb = pos.get("fretboard")
+        st = pos.get("string")
+        errors[finger] = {
+            "fret_error": None if fb is None else fb - fret,
+            "string_error": None if st is None else min((st - s for s in strings), key=abs),
+        }
+    return errors
+
+def chord_matches(chord_name: str, finger_positions: dict) -> bool:
+    shape = CHORD_SHAPES[chord_name]
+    return chord_name in CHORD_INDEX.get(_observed_key(shape, finger_positions), ())
+
+def match_chord(chord_name: str, finger_positions: dict) -> dict:
+    return {
+        "chord": chord_name,
+        "matched": chord_matches(chord_name, finger_positions),
+        "finger_errors": finger_errors(CHORD_SHAPES[chord_name], finger_positions),
+    }
+
+def update_chord_streak(tracker, chord_name: str, matched: bool, frames: int = 1) -> bool:
+    # 세션별 연속 일치 프레임 수를 갱신하고 confident 여부 반환 (frames: 이 판정에서 실제로 일치한 프레임 수)
+    if tracker.chord_name != chord_name:
+        tracker.chord_name = chord_name
+        tracker.chord_streak = 0
+    tracker.chord_streak = tracker.chord_streak + frames if matched else 0
+    return tracker.chord_streak >= CHORD_CONFIDENT_FRAMES
@@ -8,4 +8,62 @@ MIN_SCORE_FRET = 0.5
 MIN_SCORE_NUT = 0.5
 STABLE_FRAMES = 5          # 안정 프레임 수
 REDETECT_ERROR_THRESHOLD = 1
-MAX_MISSING_FRAMES = 30
\ No newline at end of file
+MAX_MISSING_FRAMES = 30
+# 캘리브레이션 저장/재사용 (device_token 기준)
+CALIBRATION_DIR = "calibrations"
+RELOCK_FRAMES = 2            # 저장된 지오메트리 검증에 필요한 연속 프레임 수
+RELOCK_ERROR_THRESHOLD = 0.05
+
+# 영상 분석 (오프라인)
+VIDEO_SAMPLE_FPS = 10        # 기본 샘플링 fps
+VIDEO_BATCH_SIZE = 8         # YOLO 배치 추론 단위
+VIDEO_UPLOAD_CHUNK = 1024 * 1024
+
+# 코드(chord) 판정
+CHORD_OPTIONAL_FINGERS = 1   # 3손가락 이상 코드에서 인식 누락을 허용할 손가락 수
+CHORD_CONFIDENT_FRAMES = 3   # 연속 일치 프레임 수 (이후 업로드 중단 가능)
+
+# 부하 적응형 품질 제어 (단계가 높을수록 저품질/저비용)
+QUALITY_LEVELS = [
+    {"hand_complexity": 1, "imgsz": 640, "seg_interval": 1},
+    {"hand_complexity": 0, "imgsz": 640, "seg_interval": 1},
+    {"hand_complexity": 0, "imgsz": 480, "seg_interval": 2},
+    {"hand_complexity": 0, "imgsz": 320, "seg_interval": 3},
+]
+QUALITY_TARGET_P95_MS = 300      # 프레임당 목표 p95 지연
+QUALITY_HEADROOM_RATIO = 0.6     # p95가 목표의 이 비율 이하이면 품질 상향
+QUALITY_MAX_QUEUE_DEPTH = 8      # 동시 처리 중인 요청 수 상한
+QUALITY_HEADROOM_QUEUE_DEPTH = QUALITY_MAX_QUEUE_DEPTH // 4   # 품질 상향을 허용하는 동시 요청 수 (자기 요청 포함)
+QUALITY_WINDOW = 50              # 최근 지연 표본 수
+QUALITY_MIN_SAMPLES = 20         # 판단에 필요한 최소 표본 수
+QUALITY_COOLDOWN_SEC = 5.0       # 단계 변경 후 최소 유지 시간
+
+# 세션 내 파이프라인 (decode / YOLO / Mediapipe 단계 중첩)
+PIPELINE_DEPTH = 2           # 상태 갱신보다 앞서 제출해 둘 프레임 수
+
+# 프레임당 단계별 메모리 할당 예산 (tracemalloc peak 기준, bytes)
+# 1920x1080 프레임, 후보 마스크 21개에서 측정한 값 + 여유분
+#   masks 1.2MB (마스크 해상도 임시 배열, 후보별로는 외곽선만 보관), geometry 1.4KB, hands 0 (RGB 버퍼 재사용), assign 3.2KB
+# yolo 단계는 torch 할당이 tracemalloc에 잡히지 않아 예산 없이 보고만 함
+ALLOC_BUDGETS = {
+    "masks": 2 * 1024 * 1024,
+    "geometry": 64 * 1024,
+    "hands": 1 * 1024 * 1024,
+    "assign": 64 * 1024,
+}
+
+# /ai/tracking 단일 본문 버스트 형식
+BURST_LENGTH_PREFIXED_TYPE = "application/x-jpeg-sequence"   # [4바이트 big-endian 길이][JPEG] 반복
+BURST_MJPEG_TYPES = ("video/x-motion-jpeg", "multipart/x-mixed-replace", "image/jpeg")
+MAX_BURST_FRAMES = 64
+FORM_MEDIA_TYPES = ("multipart/form-data", "application/x-www-form-urlencoded")  # 폼으로 파싱되는 본문 – 버스트로 읽지 않음
+
+# 프렛 간격 물리 모델 (12평균율: 너트에서 n번 프렛까지 = L * (1 - 2^(-n/12)))
+FRETBOARD_TAPER = 0.4            # 스케일 길이당 지판 폭 증가율 (너트 폭 = 1)
+# 최소 관측 프렛 수는 시뮬레이션(무작위 원근, 코너 노이즈 σ, 300회)에서 예측 프렛이
+# 반 칸 이상 어긋난 비율로 정함: σ=1.5px 6개 34% / 8개 5% / 12개 0%, σ=3px 8개 36% / 12개 1%
+# 초기 고정은 STABLE_FRAMES 연속 프레임의 예측이 서로 일치해야 하며, 이때 12개 σ=3px 오예측 0.4%
+FRET_PRIOR_MIN_FRETS = 12        # 부분 프렛으로 초기 검출을 고정할 최소 프렛 수
+FRET_PRIOR_MIN_TRACK_FRETS = 12  # 추적 중 호모그래피 보간에 필요한 최소 관측 프렛 수
+FRET_PRIOR_MAX_ERROR = 0.1       # 재투영 오차 허용치 (평균 프렛 간격 대비)
+FRET_PRIOR_MAX_DRIFT = 0.5       # 예측 프렛이 기준 위치(이전 예측/마지막 위치)와 달라도 되는 한도 (해당 칸 간격 대비)
@@ -3,16 +3,22 @@ import cv2
 import numpy as np
 import mediapipe as mp
 from ultralytics import YOLO
+import time
 import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from config import (
     CLASS_NUT, CLASS_FRET, NUM_FRETS, 
     MIN_SCORE_NUT, MIN_SCORE_FRET, STABLE_FRAMES, 
     REDETECT_ERROR_THRESHOLD, MAX_MISSING_FRAMES, 
-    MODEL_PATH
+    MODEL_PATH, RELOCK_FRAMES, RELOCK_ERROR_THRESHOLD,
+    PIPELINE_DEPTH, FRET_PRIOR_MIN_FRETS, FRET_PRIOR_MIN_TRACK_FRETS
 )
+from quality_controller import QUALITY_CONTROLLER
 from utils import (
     get_segmentation_masks,
     get_top_bottom_points,
+    largest_contour,
     sort_frets_by_distance_from_nut,
     compute_initial_geometry,
     select_topmost_nut,
@@ -28,6 +34,10 @@ from utils import (
     smooth_fret_corners,
     enforce_fret_ordering,
     get_center, 
+    fill_corners_with_fret_prior,
+    fret_predictions_agree,
+    fit_frame_to_reference,
+    transform_corner,
 )
 
 # ======================================
@@ -40,20 +50,70 @@ FINGER_TIP_MAP = {1: 8, 2: 12, 3: 16, 4: 20}
 FINGER_DIP_MAP = {1: 7, 2: 11, 3: 15, 4: 19}
 OFFSET_RATIO = 0.2
 
+def _identity(frame):
+    return frame
+
 # ======================================
 # 3) GuitarTracker 클래스 (세션별 상태 캡슐화)
 class GuitarTracker:
-    def __init__(self):
+    def __init__(self, profiler=None, device_token=None):
         self.model = YOLO(MODEL_PATH)
-        self.hands = mp.solutions.hands.Hands(
-            model_complexity=1,
-            min_detection_confidence=0.5,
-            min_tracking_confidence=0.5
-        )
+        # 캘리브레이션 저장/재사용 키 (없으면 저장하지 않음)
+        self.device_token = device_token
+        # 프로파일링 모드 (alloc_profiler.AllocProfiler)
+        self.profiler = profiler
+        # 프레임마다 재사용하는 버퍼 (mask 리사이즈, Mediapipe용 RGB)
+        self._mask_scratch = None
+        self._rgb_buffer = None
+        # model_complexity별 Hands 인스턴스 (품질 단계에 따라 교체)
+        self._hands_by_complexity = {}
+        self.hand_complexity = 1
+        self.hands = self._get_hands(self.hand_complexity)
+        self.imgsz = 640
+        self.seg_interval = 1
+        self.frame_index = 0
+        # 파이프라인 단계별 단일 워커 (단계 내 순서 보장, 단계 간 병렬)
+        self._decode_pool = None
+        self._yolo_pool = None
+        self._hands_pool = None
         self.finger_tip_map = FINGER_TIP_MAP
         self.finger_DIP_map = FINGER_DIP_MAP
+        # 서버측 코드 판정용 (chord_matcher에서 갱신)
+        self.chord_name = None
+        self.chord_streak = 0
         self.reset_state()
 
+    def _get_hands(self, complexity: int):
+        if complexity not in self._hands_by_complexity:
+            self._hands_by_complexity[complexity] = mp.solutions.hands.Hands(
+                model_complexity=complexity,
+                min_detection_confidence=0.5,
+                min_tracking_confidence=0.5
+            )
+        return self._hands_by_complexity[complexity]
+
+    def apply_quality(self, settings: dict):
+        # QualityController가 정한 단계 반영
+        if settings["hand_complexity"] != self.hand_complexity:
+            self.hand_complexity = settings["hand_complexity"]
+            self.hands = self._get_hands(self.hand_complexity)
+        self.imgsz = settings["imgsz"]
+        self.seg_interval = settings["seg_interval"]
+
+    def _checkpoint(self, stage: str):
+        if self.profiler is not None:
+            self.profiler.checkpoint(stage)
+
+    def _mask_contour(self, mask, frame_shape):
+        # 전체 해상도 리사이즈/이진화는 재사용 버퍼에서 하고, 후보별로는 가장 큰 외곽선만 보관
+        H, W = frame_shape[:2]
+        if self._mask_scratch is None or self._mask_scratch.shape != (H, W):
+            self._mask_scratch = np.empty((H, W), dtype=np.uint8)
+        m255 = (mask * 255).astype(np.uint8)
+        cv2.resize(m255, (W, H), dst=self._mask_scratch)
+        cv2.threshold(self._mask_scratch, 127, 255, cv2.THRESH_BINARY, dst=self._mask_scratch)
+        return largest_contour(self._mask_scratch)
+
     def reset_state(self):
         self.detection_done = False
         self.stable_count = 0
@@ -67,16 +127,256 @@ class GuitarTracker:
         self.fret_missing_frames = 0
         self.finger_positions = {}
         self.mode = "detection"
+        self.calibration = None
+        self.relock_count = 0
+        self.calibration_updated = False
+        self.predicted_frets = set()   # 부분 고정 시 모델로 채운(아직 관측되지 않은) 프렛 번호
+        self.prior_reference = None    # 부분 고정 대기 중 직전 프레임의 모델 예측
+
+    def export_calibration(self):
+        # 검출이 끝난 상태의 지오메트리 스냅샷 (재접속 시 재사용)
+        # 모델로 예측만 한 프렛은 번호를 함께 남겨, 재고정 후 관측되면 계속 보정
+        if not self.detection_done:
+            return None
+        return {
+            "init_corners": list(self.init_corners),
+            "fret_geometry": list(self.fret_geometry),
+            "nut_box": self.nut_box,
+            "far_fret_box": self.far_fret_box,
+            "predicted_frets": sorted(self.predicted_frets),
+        }
+
+    def load_calibration(self, snapshot):
+        # 저장된 스냅샷으로 빠른 재고정(relock) 대기
+        self.calibration = snapshot
+        self.relock_count = 0
+
+    def _build_detected_list(self, nut_candidates, fret_candidates):
+        detected_list = []
+        nut_cnt = select_topmost_nut(nut_candidates)
+        if nut_cnt is not None:
+            tpt, bpt = get_top_bottom_points(nut_cnt)
+            if tpt and bpt:
+                detected_list.append({'class_id': CLASS_NUT, 'lr': (tpt, bpt)})
+        for fc in fret_candidates:
+            tpt, bpt = get_top_bottom_points(fc['cnt'])
+            if tpt and bpt:
+                detected_list.append({'class_id': CLASS_FRET, 'lr': (tpt, bpt)})
+        return detected_list
+
+    def _initial_corners(self, nut_candidates, fret_candidates):
+        # 너트와 너트에서 가까운 순으로 정렬한 프렛의 (top, bottom). 빠진 프렛은 모델로 채움
+        tpt, bpt = get_top_bottom_points(nut_candidates[0]['cnt'])
+        if not (tpt and bpt):
+            return None, set()
+        corners = [None]*(NUM_FRETS+1)
+        corners[0] = (tpt, bpt)
+        flist = []
+        for fc in fret_candidates:
+            tfpt, bfpt = get_top_bottom_points(fc['cnt'])
+            if tfpt and bfpt:
+                flist.append({'class_id': CLASS_FRET, 'lr': (tfpt, bfpt)})
+        flist = sort_frets_by_distance_from_nut((tpt, bpt), flist)
+        flist = flist[:NUM_FRETS]
+        for i, fc in enumerate(flist):
+            corners[i+1] = fc['lr']
+        if len(flist) == NUM_FRETS:
+            return corners, set()
+        # 보이는 프렛이 너트부터 연속이라고 보고 모델 적합 (오차가 크면 None)
+        predicted = set(range(len(flist)+1, NUM_FRETS+1))
+        return fill_corners_with_fret_prior(corners, FRET_PRIOR_MIN_FRETS), predicted
+
+    def _confirm_predicted_frets(self, new_corners):
+        # 예측으로 채웠던 프렛이 실제로 검출되면 고정 시점 좌표로 옮겨 초기 지오메트리를 관측값으로 교체
+        # 고정 이후의 이동/확대/회전/원근 변화는 관측된 프렛끼리의 현재→고정 시점 호모그래피로 되돌림
+        seen = [i for i in self.predicted_frets if new_corners[i] is not None]
+        if not seen:
+            return
+        H = fit_frame_to_reference(new_corners, self.init_corners, FRET_PRIOR_MIN_TRACK_FRETS, self.predicted_frets)
+        if H is None:
+            return
+        confirmed = []
+        for i in seen:
+            mapped = list(self.init_corners)
+            mapped[i] = transform_corner(H, new_corners[i])
+            # 예측 위치와 반 칸 이상 다르면 다른 프렛을 잘못 짝지은 것으로 보고 보류
+            if fret_predictions_agree(mapped, self.init_corners, [i]):
+                confirmed.append((i, mapped[i]))
+        if not confirmed:
+            return
+        for i, corner in confirmed:
+            self.init_corners[i] = corner
+            self.predicted_frets.discard(i)
+        self.fret_geometry = compute_initial_geometry(self.init_corners)
+        self.calibration_updated = True
+        if not self.predicted_frets:
+            logger.info("예측했던 프렛이 모두 관측되어 캘리브레이션을 확정합니다.")
+
+    def _try_relock(self, nut_candidates, fret_candidates) -> bool:
+        # 저장된 지오메트리를 현재 프레임에 맞춰보고, 오차가 작으면 전체 검출 없이 추적 모드로 진입
+        calib = self.calibration
+        detected_list = self._build_detected_list(nut_candidates, fret_candidates)
+        new_corners = match_line_corners_ordered(detected_list, calib["init_corners"], calib["fret_geometry"])
+        err = measure_error_from_geometry(new_corners, calib["fret_geometry"])
+        if err > RELOCK_ERROR_THRESHOLD:
+            self.relock_count = 0
+            return False
+        self.relock_count += 1
+        if self.relock_count < RELOCK_FRAMES:
+            return False
+        self.init_corners = list(calib["init_corners"])
+        self.fret_geometry = list(calib["fret_geometry"])
+        self.fret_corners = new_corners
+        for i in range(NUM_FRETS+1):
+            self.fret_last_known[i] = new_corners[i] if new_corners[i] is not None else self.init_corners[i]
+        self.nut_box = calib["nut_box"]
+        self.far_fret_box = calib["far_fret_box"]
+        self.predicted_frets = set(calib["predicted_frets"])
+        self.calibration = None
+        self.detection_done = True
+        self.mode = "tracking"
+        logger.info("저장된 캘리브레이션으로 재고정되었습니다.")
+        return True
 
     def process_frame(self, frame: np.ndarray) -> dict:
+        self.apply_quality(QUALITY_CONTROLLER.current())
+        if self.profiler is not None:
+            self.profiler.start_frame()
+        start = time.perf_counter()
+        self.frame_index += 1
+        if self.detection_done and self.frame_index % self.seg_interval != 0:
+            # 분할 생략 프레임: 직전 프렛 지오메트리를 그대로 쓰고 손가락만 추적
+            result = self._locate_fingers(frame)
+        else:
+            try:
+                # 1) YOLO 추론
+                t0 = time.perf_counter()
+                results = self.model.predict(source=frame, imgsz=self.imgsz, verbose=False)[0]
+                segs = get_segmentation_masks(results)
+                QUALITY_CONTROLLER.record("yolo", (time.perf_counter() - t0) * 1000)
+            except Exception as e:
+                logger.exception("모델 추론 중 예외 발생")
+                return {"detection_done": False, "finger_positions": {}}
+            self._checkpoint("yolo")
+            result = self._process_segments(frame, segs)
+        QUALITY_CONTROLLER.record("frame", (time.perf_counter() - start) * 1000)
+        if self.profiler is not None:
+            self.profiler.end_frame()
+        return result
+
+    def process_frames(self, frames: list) -> list:
+        # 여러 프레임을 YOLO 배치 추론 한 번으로 처리 (상태 갱신은 프레임 순서대로)
+        if not frames:
+            return []
+        self.apply_quality(QUALITY_CONTROLLER.current())
+        start = time.perf_counter()
+        # 분할 주기는 배치 시작 시점의 상태로 결정 (검출 전이면 모두 분할)
+        run_seg = []
+        for _ in frames:
+            self.frame_index += 1
+            run_seg.append(not (self.detection_done and self.frame_index % self.seg_interval != 0))
+        seg_frames = [frame for frame, seg in zip(frames, run_seg) if seg]
+        batch_segs = []
+        if seg_frames:
+            try:
+                t0 = time.perf_counter()
+                batch_results = self.model.predict(source=seg_frames, imgsz=self.imgsz, verbose=False)
+                batch_segs = [get_segmentation_masks(r) for r in batch_results]
+                QUALITY_CONTROLLER.record("yolo", (time.perf_counter() - t0) * 1000 / len(seg_frames))
+            except Exception as e:
+                logger.exception("모델 배치 추론 중 예외 발생")
+                return [{"detection_done": False, "finger_positions": {}} for _ in frames]
+        segs_iter = iter(batch_segs)
+        results = []
+        for frame, seg in zip(frames, run_seg):
+            if seg:
+                results.append(self._process_segments(frame, next(segs_iter)))
+            elif self.detection_done:
+                # 분할 생략 프레임: 직전 프렛 지오메트리를 그대로 쓰고 손가락만 추적
+                results.append(self._locate_fingers(frame))
+            else:
+                results.append({"detection_done": False, "finger_positions": {}})
+        # 배치 전체 시간을 프레임당 지연으로 환산해 기록
+        per_frame_ms = (time.perf_counter() - start) * 1000 / len(frames)
+        for _ in frames:
+            QUALITY_CONTROLLER.record("frame", per_frame_ms)
+        return results
+
+    def _ensure_pools(self):
+        if self._yolo_pool is None:
+            self._decode_pool = ThreadPoolExecutor(max_workers=1)
+            self._yolo_pool = ThreadPoolExecutor(max_workers=1)
+            self._hands_pool = ThreadPoolExecutor(max_workers=1)
+
+    def _predict_after(self, frame_future):
+        frame = frame_future.result()
         try:
-            # 1) YOLO 추론
-            results = self.model.predict(source=frame, verbose=False)[0]
+            t0 = time.perf_counter()
+            results = self.model.predict(source=frame, imgsz=self.imgsz, verbose=False)[0]
             segs = get_segmentation_masks(results)
+            QUALITY_CONTROLLER.record("yolo", (time.perf_counter() - t0) * 1000)
+            return segs
         except Exception as e:
             logger.exception("모델 추론 중 예외 발생")
-            return {"detection_done": False, "finger_positions": {}}
-        
+            return None
+
+    def _hands_after(self, frame_future):
+        return self._run_hands(frame_future.result())
+
+    def _submit_frame(self, source, decode):
+        # 프레임 N+1의 decode/YOLO/Mediapipe를 프레임 N의 상태 갱신과 겹쳐 실행
+        frame_future = self._decode_pool.submit(decode, source)
+        self.frame_index += 1
+        run_seg = not (self.detection_done and self.frame_index % self.seg_interval != 0)
+        yolo_future = self._yolo_pool.submit(self._predict_after, frame_future) if run_seg else None
+        # 손가락 위치는 추적 모드에서만 필요하므로 그때만 미리 실행
+        hands_future = self._hands_pool.submit(self._hands_after, frame_future) if self.detection_done else None
+        return frame_future, yolo_future, hands_future
+
+    def _finish_frame(self, item) -> dict:
+        # 트래커 상태 갱신은 호출 스레드에서 프레임 순서대로 수행
+        frame_future, yolo_future, hands_future = item
+        frame = frame_future.result()
+        if yolo_future is None:
+            if not self.detection_done:
+                result = {"detection_done": False, "finger_positions": {}}
+            else:
+                result = self._locate_fingers(frame, hands_future)
+        else:
+            segs = yolo_future.result()
+            if segs is None:
+                return {"detection_done": False, "finger_positions": {}}
+            result = self._process_segments(frame, segs, hands_future)
+        return result
+
+    def process_stream(self, sources, decode=None):
+        """여러 프레임(또는 decode로 변환할 인코딩 바이트)을 단계별 파이프라인으로 처리.
+        YOLO와 Mediapipe는 같은 프레임에 대해 동시에, decode는 이전 프레임 추론과 겹쳐 실행되며
+        결과는 입력 순서대로 반환한다. decode 예외는 해당 프레임 결과를 꺼낼 때 전파된다."""
+        decode = decode or _identity
+        self.apply_quality(QUALITY_CONTROLLER.current())
+        self._ensure_pools()
+        pending = deque()
+        # 프레임 지연은 직전 프레임 완료 이후 걸린 시간으로 기록 – 합이 전체 처리 시간과 같아
+        # process_frames의 배치 시간/프레임 수와 같은 지표 (앞 프레임을 기다린 시간은 중복 집계 X)
+        last = time.perf_counter()
+
+        def finish(item):
+            nonlocal last
+            result = self._finish_frame(item)
+            now = time.perf_counter()
+            QUALITY_CONTROLLER.record("frame", (now - last) * 1000)
+            last = now
+            return result
+
+        for source in sources:
+            pending.append(self._submit_frame(source, decode))
+            if len(pending) > PIPELINE_DEPTH:
+                yield finish(pending.popleft())
+        while pending:
+            yield finish(pending.popleft())
+
+    def _process_segments(self, frame: np.ndarray, segs: list, hands_future=None) -> dict:
         nut_candidates = []
         fret_candidates = []
 
@@ -84,63 +384,68 @@ class GuitarTracker:
         try:
             for mask, cid, score in segs:
                 if cid == CLASS_NUT and score >= MIN_SCORE_NUT:
-                    m255 = (mask * 255).astype(np.uint8)
-                    m255 = cv2.resize(m255, (frame.shape[1], frame.shape[0]))
-                    _, b = cv2.threshold(m255, 127, 255, cv2.THRESH_BINARY)
-                    nut_candidates.append({'class_id': cid, 'bin': b})
+                    nut_candidates.append({'class_id': cid, 'cnt': self._mask_contour(mask, frame.shape)})
                 elif cid == CLASS_FRET and score >= MIN_SCORE_FRET:
-                    m255 = (mask * 255).astype(np.uint8)
-                    m255 = cv2.resize(m255, (frame.shape[1], frame.shape[0]))
-                    _, b = cv2.threshold(m255, 127, 255, cv2.THRESH_BINARY)
-                    fret_candidates.append({'class_id': cid, 'bin': b})
+                    fret_candidates.append({'class_id': cid, 'cnt': self._mask_contour(mask, frame.shape)})
         except Exception as e:
             logger.exception("후처리(후보군 수집) 중 예외 발생")
             return {"detection_done": False, "finger_positions": {}}
+        self._checkpoint("masks")
 
         # 2) 초기 검출 모드
         if not self.detection_done:
-            if len(nut_candidates) == 1 and len(fret_candidates) >= NUM_FRETS:
+            if self.calibration is not None and self._try_relock(nut_candidates, fret_candidates):
+                return {"detection_done": self.detection_done, "finger_positions": {}}
+            # 프렛이 NUM_FRETS개 미만이어도 프렛 간격 모델로 나머지를 예측할 수 있으면 진행
+            if len(nut_candidates) == 1 and len(fret_candidates) >= FRET_PRIOR_MIN_FRETS:
+                corners, predicted = self._initial_corners(nut_candidates, fret_candidates)
+                if corners is None:
+                    self.stable_count = 0
+                    self.prior_reference = None
+                    return {"detection_done": self.detection_done, "finger_positions": {}}
+                if predicted:
+                    # 모델 예측은 안정 구간의 연속 프레임끼리 일치해야 채택 (노이즈로 한 칸 어긋난 적합 배제)
+                    if self.prior_reference is not None and not fret_predictions_agree(corners, self.prior_reference, predicted):
+                        self.stable_count = 0
+                    self.prior_reference = corners
+                else:
+                    self.prior_reference = None
                 self.stable_count += 1
                 if self.stable_count >= STABLE_FRAMES:
-                    nbin = nut_candidates[0]['bin']
-                    tpt, bpt = get_top_bottom_points(nbin)
-                    if tpt and bpt:
-                        self.fret_corners[0] = (tpt, bpt)
-                        self.fret_last_known[0] = (tpt, bpt)
-                        flist = []
-                        for fc in fret_candidates:
-                            tfpt, bfpt = get_top_bottom_points(fc['bin'])
-                            if tfpt and bfpt:
-                                flist.append({'class_id': CLASS_FRET, 'lr': (tfpt, bfpt)})
-                        flist = sort_frets_by_distance_from_nut((tpt, bpt), flist)
-                        flist = flist[:NUM_FRETS]
-                        for i, fc in enumerate(flist):
-                            self.fret_corners[i+1] = fc['lr']
-                            self.fret_last_known[i+1] = fc['lr']
-                        for i in range(NUM_FRETS+1):
-                            self.init_corners[i] = self.fret_corners[i]
-                        self.fret_geometry = compute_initial_geometry(self.fret_corners)
-                        self.detection_done = True
-                        self.mode = "tracking"
+                    for i in range(NUM_FRETS+1):
+                        self.fret_corners[i] = corners[i]
+                        self.fret_last_known[i] = corners[i]
+                    for i in range(NUM_FRETS+1):
+                        self.init_corners[i] = self.fret_corners[i]
+                    self.fret_geometry = compute_initial_geometry(self.fret_corners)
+                    self.predicted_frets = predicted
+                    self.prior_reference = None
+                    self.detection_done = True
+                    self.mode = "tracking"
+                    self.calibration = None
+                    self.calibration_updated = True
             else:
                 self.stable_count = 0
+                self.prior_reference = None
             return {"detection_done": self.detection_done, "finger_positions": {}}
         else:
             # 3) 추적 모드
-            detected_list = []
-            nut_bin = select_topmost_nut(nut_candidates)
-            if nut_bin is not None:
-                tpt, bpt = get_top_bottom_points(nut_bin)
-                if tpt and bpt:
-                    detected_list.append({'class_id': CLASS_NUT, 'lr': (tpt, bpt)})
-            for fc in fret_candidates:
-                tpt, bpt = get_top_bottom_points(fc['bin'])
-                if tpt and bpt:
-                    detected_list.append({'class_id': CLASS_FRET, 'lr': (tpt, bpt)})
+            detected_list = self._build_detected_list(nut_candidates, fret_candidates)
             new_corners = match_line_corners_ordered(detected_list, self.init_corners, self.fret_geometry)
             self.fret_corners = new_corners
             self.fret_corners = check_fret_length(self.fret_corners, self.fret_last_known)
-            self.fret_corners = interpolate_corners(self.fret_corners, self.fret_last_known, self.fret_geometry, self.far_fret_box)
+            # 부분 고정 세션은 관측된 프렛으로 원근 모델을 적합해 빠진 프렛을 예측
+            # (마지막 위치와 어긋나는 적합이나 전체 고정 세션은 기존 선형 보간)
+            predicted = None
+            if self.predicted_frets:
+                predicted = fill_corners_with_fret_prior(self.fret_corners, FRET_PRIOR_MIN_TRACK_FRETS)
+                missing = [i for i in range(1, NUM_FRETS+1) if self.fret_corners[i] is None]
+                if predicted is not None and not fret_predictions_agree(predicted, self.fret_last_known, missing):
+                    predicted = None
+            if predicted is not None:
+                self.fret_corners = predicted
+            else:
+                self.fret_corners = interpolate_corners(self.fret_corners, self.fret_last_known, self.fret_geometry, self.far_fret_box)
             self.fret_corners = smooth_fret_corners(self.fret_corners)
             if self.fret_corners[0] is not None and self.fret_corners[NUM_FRETS] is not None:
                 nut_center = get_center(*self.fret_corners[0])
@@ -150,20 +455,22 @@ class GuitarTracker:
             err = measure_error_from_geometry(self.fret_corners, self.fret_geometry)
             if err > REDETECT_ERROR_THRESHOLD:
                 logger.info("오차가 임계치를 초과하여 재검출 모드로 전환합니다.")
+                snapshot = self.export_calibration()
                 self.reset_state()
+                self.load_calibration(snapshot)
                 self.mode = "re-detection"
                 return {"detection_done": False, "finger_positions": {}}
             else:
+                if self.predicted_frets:
+                    self._confirm_predicted_frets(new_corners)
                 for i in range(NUM_FRETS+1):
                     if self.fret_corners[i] is not None:
                         self.fret_last_known[i] = self.fret_corners[i]
 
             # 4) nut_box, far_fret_box 갱신 (string 검출을 위해)
             if len(nut_candidates) == 1:
-                cnts, _ = cv2.findContours(nut_candidates[0]['bin'], cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-                if cnts:
-                    cmax = max(cnts, key=cv2.contourArea)
-                    self.nut_box = cv2.boundingRect(cmax)
+                if nut_candidates[0]['cnt'] is not None:
+                    self.nut_box = cv2.boundingRect(nut_candidates[0]['cnt'])
                     self.nut_missing_frames = 0
             else:
                 if self.nut_box and self.nut_missing_frames < MAX_MISSING_FRAMES:
@@ -176,11 +483,9 @@ class GuitarTracker:
                 best_dist = -1
                 best_box = None
                 for fc in fret_candidates:
-                    cnts, _ = cv2.findContours(fc['bin'], cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-                    if not cnts:
+                    if fc['cnt'] is None:
                         continue
-                    cmax = max(cnts, key=cv2.contourArea)
-                    fbox = cv2.boundingRect(cmax)
+                    fbox = cv2.boundingRect(fc['cnt'])
                     fcx = fbox[0] + fbox[2]*0.5
                     fcy = fbox[1] + fbox[3]*0.5
                     d_val = distance((ncx, ncy), (fcx, fcy))
@@ -194,44 +499,71 @@ class GuitarTracker:
                     self.fret_missing_frames += 1
                 else:
                     self.far_fret_box = None
-                    
-            # 손가락 검출 (Mediapipe + DIP 보정)
-            rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            hand_res = self.hands.process(rgb)
-            self.finger_positions = {}
-            fretboard_polys = build_fretboard_polygons(self.fret_corners)
-            string_polys = build_string_polygons(self.nut_box, self.far_fret_box) if (self.nut_box and self.far_fret_box) else [None]*6
-            if hand_res.multi_hand_landmarks and hand_res.multi_handedness:
-                H, W, _ = frame.shape
-                for handedness, handLms in zip(hand_res.multi_handedness, hand_res.multi_hand_landmarks):
-                    if handedness.classification[0].label == "Right":
-                        for finger_id in self.finger_tip_map.keys():
-                            tip_idx = self.finger_tip_map[finger_id]
-                            dip_idx = self.finger_DIP_map[finger_id]
-                            lm_tip = handLms.landmark[tip_idx]
-                            lm_dip = handLms.landmark[dip_idx]
-                            tip_x = int(lm_tip.x * W)
-                            tip_y = int(lm_tip.y * H)
-                            dip_x = int(lm_dip.x * W)
-                            dip_y = int(lm_dip.y * H)
-                            vec_x = tip_x - dip_x
-                            vec_y = tip_y - dip_y
-                            norm = (vec_x**2 + vec_y**2) ** 0.5
-                            if norm > 1e-5:
-                                unit_x = vec_x / norm
-                                unit_y = vec_y / norm
-                                offset = int(OFFSET_RATIO * norm)
-                                corrected_tip_x = tip_x + offset * unit_x
-                                corrected_tip_y = tip_y + offset * unit_y
-                            else:
-                                corrected_tip_x, corrected_tip_y = tip_x, tip_y
-                            fb_num = find_fretboard_of_point(int(corrected_tip_x), int(corrected_tip_y), fretboard_polys)
-                            str_num = find_string_of_point_v9(int(corrected_tip_x), int(corrected_tip_y), string_polys)
-                            self.finger_positions[finger_id] = {
-                                "fretboard": fb_num,
-                                "string": str_num
-                            }
-            return {"detection_done": self.detection_done, "finger_positions": self.finger_positions}
+
+            self._checkpoint("geometry")
+            return self._locate_fingers(frame, hands_future)
+
+    def _run_hands(self, frame: np.ndarray):
+        t0 = time.perf_counter()
+        if self._rgb_buffer is None or self._rgb_buffer.shape != frame.shape:
+            self._rgb_buffer = np.empty(frame.shape, dtype=np.uint8)
+        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=self._rgb_buffer)
+        hand_res = self.hands.process(rgb)
+        QUALITY_CONTROLLER.record("hands", (time.perf_counter() - t0) * 1000)
+        return hand_res
+
+    def _locate_fingers(self, frame: np.ndarray, hands_future=None) -> dict:
+        # 손가락 검출 (Mediapipe + DIP 보정)
+        if hands_future is not None:
+            hand_res = hands_future.result()
+        elif self._hands_pool is not None:
+            # 파이프라인 사용 중에는 Mediapipe 호출을 전용 워커로만 보냄
+            hand_res = self._hands_pool.submit(self._run_hands, frame).result()
+        else:
+            hand_res = self._run_hands(frame)
+        self._checkpoint("hands")
+        return self._assign_fingers(hand_res, frame.shape)
+
+    def _assign_fingers(self, hand_res, frame_shape) -> dict:
+        self.finger_positions = {}
+        fretboard_polys = build_fretboard_polygons(self.fret_corners)
+        string_polys = build_string_polygons(self.nut_box, self.far_fret_box) if (self.nut_box and self.far_fret_box) else [None]*6
+        if hand_res.multi_hand_landmarks and hand_res.multi_handedness:
+            H, W, _ = frame_shape
+            for handedness, handLms in zip(hand_res.multi_handedness, hand_res.multi_hand_landmarks):
+                if handedness.classification[0].label == "Right":
+                    for finger_id in self.finger_tip_map.keys():
+                        tip_idx = self.finger_tip_map[finger_id]
+                        dip_idx = self.finger_DIP_map[finger_id]
+                        lm_tip = handLms.landmark[tip_idx]
+                        lm_dip = handLms.landmark[dip_idx]
+                        tip_x = int(lm_tip.x * W)
+                        tip_y = int(lm_tip.y * H)
+                        dip_x = int(lm_dip.x * W)
+                        dip_y = int(lm_dip.y * H)
+                        vec_x = tip_x - dip_x
+                        vec_y = tip_y - dip_y
+                        norm = (vec_x**2 + vec_y**2) ** 0.5
+                        if norm > 1e-5:
+                            unit_x = vec_x / norm
+                            unit_y = vec_y / norm
+                            offset = int(OFFSET_RATIO * norm)
+                            corrected_tip_x = tip_x + offset * unit_x
+                            corrected_tip_y = tip_y + offset * unit_y
+                        else:
+                            corrected_tip_x, corrected_tip_y = tip_x, tip_y
+                        fb_num = find_fretboard_of_point(int(corrected_tip_x), int(corrected_tip_y), fretboard_polys)
+                        str_num = find_string_of_point_v9(int(corrected_tip_x), int(corrected_tip_y), string_polys)
+                        self.finger_positions[finger_id] = {
+                            "fretboard": fb_num,
+                            "string": str_num
+                        }
+        self._checkpoint("assign")
+        return {"detection_done": self.detection_done, "finger_positions": self.finger_positions}
 
     def close(self):
-        self.hands.close()
\ No newline at end of file
+        for pool in (self._decode_pool, self._yolo_pool, self._hands_pool):
+            if pool is not None:
+                pool.shutdown(wait=True)
+        for hands in self._hands_by_complexity.values():
+            hands.close()
\ No newline at end of file
@@ -0,0 +1,286 @@
+# loadtest.py
+# 다중 세션 부하 테스트 – init → detect 반복 → tracking 버스트 → stop 시나리오를
+# 동시 세션 수를 늘려가며 실행하고 처리량/지연(p50/p95/p99)/오류율/메모리 추이를 기록합니다.
+#
+#   python loadtest.py --corpus uploaded_images --levels 1,2,4,8 --duration 30
+#   python loadtest.py --url http://localhost:8000 --server-pid 1234 --arrival-rate 0.5,1,2,4
+import os
+import sys
+import json
+import glob
+import time
+import uuid
+import random
+import socket
+import argparse
+import itertools
+import threading
+import urllib.request
+import urllib.error
+from concurrent.futures import ThreadPoolExecutor
+from alloc_profiler import read_rss_bytes
+
+# ======================================
+# HTTP 헬퍼 (표준 라이브러리만 사용)
+def encode_multipart(field: str, frames: list):
+    boundary = uuid.uuid4().hex
+    parts = []
+    for i, data in enumerate(frames):
+        parts.append(
+            f"--{boundary}\r\n"
+            f"Content-Disposition: form-data; name=\"{field}\"; filename=\"frame_{i}.jpg\"\r\n"
+            f"Content-Type: image/jpeg\r\n\r\n".encode("utf-8")
+        )
+        parts.append(data)
+        parts.append(b"\r\n")
+    parts.append(f"--{boundary}--\r\n".encode("utf-8"))
+    return b"".join(parts), f"multipart/form-data; boundary={boundary}"
+
+def post(url: str, body: bytes = b"", content_type: str = None, timeout: float = 60.0):
+    req = urllib.request.Request(url, data=body, method="POST")
+    if content_type:
+        req.add_header("Content-Type", content_type)
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
+            payload = resp.read()
+            status = resp.status
+    except urllib.error.HTTPError as e:
+        payload = e.read()
+        status = e.code
+    except (urllib.error.URLError, OSError):
+        payload = b""
+        status = 0  # 연결 실패/타임아웃
+    return status, time.perf_counter() - start, payload
+
+# ======================================
+# 메모리 샘플링
+class MemorySampler(threading.Thread):
+    def __init__(self, pid: int, interval: float = 1.0):
+        super().__init__(daemon=True)
+        self.pid = pid
+        self.interval = interval
+        self.samples = []  # (unix time, rss)
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            rss = read_rss_bytes(self.pid)
+            if rss is not None:
+                self.samples.append((round(time.time(), 2), rss))
+            self._stop_event.wait(self.interval)
+
+    def stop(self):
+        self._stop_event.set()
+
+# ======================================
+# 세션 시나리오
+class Recorder:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.records = []  # (endpoint, status, latency, 완료 시각)
+
+    def add(self, endpoint: str, status: int, latency: float):
+        with self.lock:
+            self.records.append((endpoint, status, latency, time.perf_counter()))
+
+def run_session(base_url: str, corpus: list, args, recorder: Recorder, queue_wait: float = 0.0):
+    # queue_wait: open loop에서 도착 후 시작까지 기다린 시간 – 첫 요청 지연에 포함 (coordinated omission 방지)
+    status, lat, payload = post(f"{base_url}/ai/init")
+    recorder.add("init", status, queue_wait + lat)
+    if status != 200:
+        return
+    session_id = json.loads(payload)["session_id"]
+    frame_iter = itertools.cycle(random.sample(corpus, len(corpus)))
+    try:
+        # 1) 검출 – detection_done이 될 때까지 (최대 detect_frames장)
+        for _ in range(args.detect_frames):
+            body, ctype = encode_multipart("file", [next(frame_iter)])
+            status, lat, payload = post(f"{base_url}/ai/detect/{session_id}", body, ctype)
+            recorder.add("detect", status, lat)
+            if status == 200 and json.loads(payload).get("detection_done"):
+                break
+            time.sleep(args.think_time)
+        # 2) 추적 버스트
+        for _ in range(args.tracking_bursts):
+            body, ctype = encode_multipart("files", [next(frame_iter) for _ in range(args.burst_size)])
+            status, lat, _ = post(f"{base_url}/ai/tracking/{session_id}", body, ctype)
+            recorder.add("tracking", status, lat)
+            time.sleep(args.think_time)
+    finally:
+        status, lat, _ = post(f"{base_url}/ai/stop/{session_id}")
+        recorder.add("stop", status, lat)
+
+def run_level(base_url: str, corpus: list, concurrency: int, args, arrival_rate: float = 0.0) -> dict:
+    """concurrency개 세션을 동시에 유지(closed loop)하거나, arrival_rate가 주어지면
+    초당 arrival_rate의 포아송 도착(open loop, 최대 동시 세션 concurrency)으로 duration초 동안 실행."""
+    recorder = Recorder()
+    started_at = time.time()
+    deadline = time.perf_counter() + args.duration
+
+    def worker():
+        while time.perf_counter() < deadline:
+            run_session(base_url, corpus, args, recorder)
+
+    def arrival(arrived_at: float):
+        started = time.perf_counter()
+        if started >= deadline:
+            # 마감 전에 시작하지 못한 도착은 실행하지 않고 오류로 집계
+            recorder.add("dropped", 0, started - arrived_at)
+            return
+        run_session(base_url, corpus, args, recorder, started - arrived_at)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        if arrival_rate > 0:
+            while time.perf_counter() < deadline:
+                pool.submit(arrival, time.perf_counter())
+                time.sleep(random.expovariate(arrival_rate))
+        else:
+            for _ in range(concurrency):
+                pool.submit(worker)
+    # 처리량은 측정 구간(duration) 안에 끝난 요청만으로 계산
+    summary = summarize(concurrency, recorder.records, deadline, args.duration)
+    summary["offered_rate"] = arrival_rate
+    summary["started_at"] = round(started_at, 2)
+    summary["ended_at"] = round(time.time(), 2)
+    return summary
+
+# ======================================
+# 집계
+def percentile(values: list, q: float):
+    if not values:
+        return None
+    values = sorted(values)
+    idx = min(int(round(q * (len(values) - 1))), len(values) - 1)
+    return values[idx]
+
+def summarize(concurrency: int, records: list, deadline: float, duration: float) -> dict:
+    dropped = sum(1 for r in records if r[0] == "dropped")
+    lat_ms = [r[2] * 1000 for r in records if r[0] != "dropped"]
+    in_window = sum(1 for r in records if r[0] != "dropped" and r[3] <= deadline)
+    total = len(records)
+    n_4xx = sum(1 for r in records if 400 <= r[1] < 500)
+    n_5xx = sum(1 for r in records if r[1] >= 500)
+    n_err = sum(1 for r in records if r[1] != 200)
+    per_endpoint = {}
+    for ep in ("init", "detect", "tracking", "stop"):
+        ep_lat = [r[2] * 1000 for r in records if r[0] == ep]
+        if ep_lat:
+            per_endpoint[ep] = {
+                "count": len(ep_lat),
+                "p50_ms": percentile(ep_lat, 0.50),
+                "p95_ms": percentile(ep_lat, 0.95),
+            }
+    return {
+        "concurrency": concurrency,
+        "requests": total,
+        "dropped": dropped,
+        "throughput_rps": in_window / duration if duration > 0 else 0.0,
+        "p50_ms": percentile(lat_ms, 0.50),
+        "p95_ms": percentile(lat_ms, 0.95),
+        "p99_ms": percentile(lat_ms, 0.99),
+        "error_rate": n_err / total if total else 0.0,
+        "rate_4xx": n_4xx / total if total else 0.0,
+        "rate_5xx": n_5xx / total if total else 0.0,
+        "endpoints": per_endpoint,
+    }
+
+def print_curve(curve: list):
+    # open loop는 제공 부하(초당 세션 도착), closed loop는 동시 세션 수로 행을 구분
+    open_loop = any(row["offered_rate"] > 0 for row in curve)
+    print(f"{'sess/s' if open_loop else 'conc':>6} {'req':>6} {'rps':>8} {'p50ms':>9} {'p95ms':>9} {'p99ms':>9} {'err%':>6} {'4xx%':>6} {'5xx%':>6}")
+    for row in curve:
+        fmt = lambda v: f"{v:9.1f}" if v is not None else f"{'-':>9}"
+        label = f"{row['offered_rate']:6.2f}" if open_loop else f"{row['concurrency']:>6}"
+        print(f"{label} {row['requests']:>6} {row['throughput_rps']:8.2f} "
+              f"{fmt(row['p50_ms'])} {fmt(row['p95_ms'])} {fmt(row['p99_ms'])} "
+              f"{row['error_rate']*100:6.1f} {row['rate_4xx']*100:6.1f} {row['rate_5xx']*100:6.1f}")
+
+# ======================================
+# 인프로세스 서버 (uvicorn을 스레드로 기동)
+def start_in_process_server():
+    import uvicorn
+    from main import app
+
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.1)
+    return f"http://127.0.0.1:{port}", server
+
+def load_corpus(path: str) -> list:
+    files = sorted(glob.glob(os.path.join(path, "*.jpg")) + glob.glob(os.path.join(path, "*.jpeg")))
+    corpus = []
+    for fp in files:
+        with open(fp, "rb") as f:
+            corpus.append(f.read())
+    return corpus
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="PickTime AI 서버 다중 세션 부하 테스트")
+    parser.add_argument("--url", default=None, help="대상 서버 (미지정 시 인프로세스로 기동)")
+    parser.add_argument("--server-pid", type=int, default=None, help="메모리 측정 대상 서버 PID")
+    parser.add_argument("--corpus", default="uploaded_images", help="녹화 프레임(jpg) 디렉터리")
+    parser.add_argument("--levels", default="1,2,4,8", help="동시 세션 수 목록 (쉼표 구분, closed loop)")
+    parser.add_argument("--duration", type=float, default=30.0, help="단계별 실행 시간(초)")
+    parser.add_argument("--arrival-rate", default="", help="초당 세션 도착률 목록 (쉼표 구분, 지정 시 open loop로 도착률을 스윕)")
+    parser.add_argument("--max-sessions", type=int, default=64, help="open loop 최대 동시 세션 수")
+    parser.add_argument("--think-time", type=float, default=0.1, help="요청 사이 대기(초)")
+    parser.add_argument("--detect-frames", type=int, default=20)
+    parser.add_argument("--tracking-bursts", type=int, default=5)
+    parser.add_argument("--burst-size", type=int, default=10)
+    parser.add_argument("--output", default="loadtest_result.json")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    corpus = load_corpus(args.corpus)
+    if not corpus:
+        print(f"프레임 코퍼스가 비어 있습니다: {args.corpus}")
+        return 1
+
+    server = None
+    if args.url:
+        base_url = args.url.rstrip("/")
+        pid = args.server_pid
+    else:
+        base_url, server = start_in_process_server()
+        pid = os.getpid()
+        print("⚠️ 인프로세스 모드의 RSS는 부하 생성기 자신의 메모리도 포함합니다 (서버 단독 측정은 --url/--server-pid 사용).")
+
+    sampler = MemorySampler(pid) if pid else None
+    if sampler:
+        sampler.start()
+
+    curve = []
+    try:
+        rates = [float(v) for v in args.arrival_rate.split(",") if v.strip()]
+        if rates:
+            for rate in rates:
+                print(f"▶ 초당 {rate}세션 도착 (최대 동시 {args.max_sessions}) 실행 중...")
+                curve.append(run_level(base_url, corpus, args.max_sessions, args, rate))
+        else:
+            for level in [int(v) for v in args.levels.split(",") if v.strip()]:
+                print(f"▶ 동시 세션 {level}개 실행 중...")
+                curve.append(run_level(base_url, corpus, level, args))
+    finally:
+        if sampler:
+            sampler.stop()
+        if server:
+            server.should_exit = True
+
+    print_curve(curve)
+    with open(args.output, "w") as f:
+        json.dump({
+            "config": vars(args),
+            "curve": curve,
+            "memory": sampler.samples if sampler else [],
+        }, f, indent=2)
+    print(f"결과 저장: {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,10 @@
 # main.py
 import uvicorn
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from router import api_router
+from quality_controller import QUALITY_CONTROLLER
+
+INFERENCE_PATHS = ("/ai/detect/", "/ai/tracking/")
 
 def create_app() -> FastAPI:
     app = FastAPI(
@@ -11,6 +14,19 @@ def create_app() -> FastAPI:
     )
     print("실행합니다.")
     app.include_router(api_router, prefix="/ai")
+
+    # 처리 중인 추론 요청 수(대기열 깊이)를 품질 제어기에 전달
+    # /ai/video는 스트리밍 응답이므로 video_analysis에서 프레임 처리 동안 직접 집계
+    @app.middleware("http")
+    async def track_in_flight(request: Request, call_next):
+        if not request.url.path.startswith(INFERENCE_PATHS):
+            return await call_next(request)
+        QUALITY_CONTROLLER.enter()
+        try:
+            return await call_next(request)
+        finally:
+            QUALITY_CONTROLLER.exit()
+
     return app
 
 app = create_app()
@@ -0,0 +1,96 @@
+# quality_controller.py
+import time
+import logging
+import threading
+from collections import deque
+from config import (
+    QUALITY_LEVELS, QUALITY_TARGET_P95_MS, QUALITY_HEADROOM_RATIO,
+    QUALITY_MAX_QUEUE_DEPTH, QUALITY_HEADROOM_QUEUE_DEPTH, QUALITY_WINDOW, QUALITY_MIN_SAMPLES,
+    QUALITY_COOLDOWN_SEC
+)
+
+logger = logging.getLogger(__name__)
+
+def _p95(values):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(int(0.95 * len(ordered)), len(ordered) - 1)]
+
+class QualityController:
+    """대기 중인 요청 수와 최근 단계별 지연을 보고 품질 단계를 조정.
+    부하가 높으면 단계를 내려(Mediapipe complexity, YOLO imgsz, 분할 주기) 목표 p95를 지키고,
+    여유가 생기면 다시 올린다. 프로세스 전역에서 하나만 사용."""
+
+    def __init__(self, levels=QUALITY_LEVELS, target_p95_ms=QUALITY_TARGET_P95_MS):
+        self.levels = levels
+        self.target_p95_ms = target_p95_ms
+        self.level = 0
+        self.in_flight = 0
+        self.frame_latencies = deque(maxlen=QUALITY_WINDOW)
+        self.stage_latencies = {}
+        self.transitions = deque(maxlen=50)
+        self.last_change = 0.0
+        self.lock = threading.Lock()
+
+    def current(self) -> dict:
+        return self.levels[self.level]
+
+    def enter(self):
+        with self.lock:
+            self.in_flight += 1
+
+    def exit(self):
+        with self.lock:
+            self.in_flight -= 1
+
+    def record(self, stage: str, elapsed_ms: float):
+        with self.lock:
+            if stage == "frame":
+                self.frame_latencies.append(elapsed_ms)
+                self._evaluate()
+            else:
+                self.stage_latencies.setdefault(stage, deque(maxlen=QUALITY_WINDOW)).append(elapsed_ms)
+
+    def _evaluate(self):
+        if len(self.frame_latencies) < QUALITY_MIN_SAMPLES:
+            return
+        now = time.monotonic()
+        if now - self.last_change < QUALITY_COOLDOWN_SEC:
+            return
+        p95 = _p95(self.frame_latencies)
+        overloaded = p95 > self.target_p95_ms or self.in_flight > QUALITY_MAX_QUEUE_DEPTH
+        if overloaded and self.level < len(self.levels) - 1:
+            self._set_level(self.level + 1, p95, now)
+        elif (not overloaded and self.level > 0
+              and p95 < self.target_p95_ms * QUALITY_HEADROOM_RATIO
+              and self.in_flight <= QUALITY_HEADROOM_QUEUE_DEPTH):
+            self._set_level(self.level - 1, p95, now)
+
+    def _set_level(self, level: int, p95: float, now: float):
+        logger.info(f"품질 단계 변경: {self.level} -> {level} (p95={p95:.1f}ms, in_flight={self.in_flight})")
+        self.transitions.append({
+            "time": time.time(),
+            "from": self.level,
+            "to": level,
+            "p95_ms": p95,
+            "in_flight": self.in_flight,
+        })
+        self.level = level
+        self.last_change = now
+        # 새 단계의 지연으로 다시 판단하도록 표본 초기화
+        self.frame_latencies.clear()
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            return {
+                "level": self.level,
+                "settings": self.levels[self.level],
+                "in_flight": self.in_flight,
+                "target_p95_ms": self.target_p95_ms,
+                "frame_p95_ms": _p95(self.frame_latencies),
+                "stage_p95_ms": {k: _p95(v) for k, v in self.stage_latencies.items()},
+                "transitions": list(self.transitions),
+            }
+
+QUALITY_CONTROLLER = QualityController()
@@ -1,11 +1,22 @@
 # router.py
-from fastapi import APIRouter, UploadFile, File, Path, HTTPException
-from session_manager import create_session, get_session, remove_session
+from fastapi import APIRouter, UploadFile, File, Path, Query, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from session_manager import create_session, get_session, remove_session, persist_calibration
 import numpy as np
 import cv2
 import logging
-from typing import List
+from typing import List, Optional
 import os
+from config import VIDEO_SAMPLE_FPS, VIDEO_BATCH_SIZE, FORM_MEDIA_TYPES
+from starlette.background import BackgroundTasks
+from video_analysis import (
+    spool_upload_to_disk, can_open_video, analyze_video,
+    start_video_analysis, finish_video_analysis
+)
+from quality_controller import QUALITY_CONTROLLER
+from chord_matcher import CHORD_SHAPES, match_chord, chord_matches, update_chord_streak
+from burst_parser import split_burst
 
 logger = logging.getLogger(__name__)
 
@@ -15,10 +26,34 @@ api_router = APIRouter()
 def index():
     return "test 성공"
 
+# 품질 단계/지연 지표
+@api_router.get("/metrics")
+def metrics():
+    return QUALITY_CONTROLLER.snapshot()
+
+def decode_image(file_bytes: bytes) -> np.ndarray:
+    # 빈 입력/손상된 이미지는 모두 ValueError로 통일 (cv2.imdecode는 빈 버퍼에 cv2.error를 던짐)
+    if len(file_bytes) == 0:
+        raise ValueError("Empty image")
+    np_arr = np.frombuffer(file_bytes, np.uint8)
+    try:
+        frame = cv2.imdecode(np_arr, cv2.IMREAD_COLOR)
+    except cv2.error as e:
+        raise ValueError("Failed to decode image") from e
+    if frame is None:
+        raise ValueError("Failed to decode image")
+    return frame
+
+def validate_chord(chord: Optional[str]) -> None:
+    if chord is not None and chord not in CHORD_SHAPES:
+        raise HTTPException(status_code=400, detail="Unknown chord")
+
 @api_router.post("/init")
-def init_session():
+def init_session(
+    device_token: Optional[str] = Query(None)  # 캘리브레이션 재사용 키
+):
     try:
-        session_id = create_session()
+        session_id = create_session(device_token)
         logger.info(f"세션 생성됨: {session_id}")
         return {"session_id": session_id}
     except Exception as e:
@@ -29,11 +64,13 @@ def init_session():
 @api_router.post("/detect/{session_id}")
 def detect(
     session_id: str = Path(...),
-    file: UploadFile = File(...)
+    file: UploadFile = File(...),
+    chord: Optional[str] = Query(None)  # 기대 코드 (지정 시 서버에서 판정)
 ):
     tracker = get_session(session_id)
     if tracker is None:
         raise HTTPException(status_code=400, detail="Invalid session_id")
+    validate_chord(chord)
     
     try:
         # ✅ 파일 바이트 읽기 (딱 한 번)
@@ -56,39 +93,64 @@ def detect(
         raise HTTPException(status_code=400, detail="Failed to decode image")
 
     result = tracker.process_frame(frame)
+    persist_calibration(tracker)
     logger.info("** detect API **")
     logger.info(f"detection_done: {result['detection_done']}")
     logger.info(f"finger_positions: {result['finger_positions']}")
-    return {
+    response = {
         "detection_done": result["detection_done"],
         "finger_positions": result["finger_positions"]
     }
+    if chord is not None:
+        chord_match = match_chord(chord, result["finger_positions"])
+        chord_match["confident"] = update_chord_streak(tracker, chord, chord_match["matched"])
+        response["chord_match"] = chord_match
+    return response
     
 # 추적용
+# multipart(files) 외에 단일 본문 버스트도 허용:
+#   Content-Type: application/x-jpeg-sequence  → [4바이트 big-endian 길이][JPEG] 반복
+#   Content-Type: video/x-motion-jpeg, image/jpeg, multipart/x-mixed-replace → MJPEG
 @api_router.post("/tracking/{session_id}")
-def tracking(
+async def tracking(
+    request: Request,
     session_id: str = Path(...),
-    files: List[UploadFile] = File(...)  # 다수의 파일을 받도록 수정
+    files: Optional[List[UploadFile]] = File(None),  # 다수의 파일을 받도록 수정
+    chord: Optional[str] = Query(None)  # 기대 코드 (지정 시 서버에서 판정)
 ):
     tracker = get_session(session_id)
     if tracker is None:
         raise HTTPException(status_code=400, detail="Invalid session_id")
-    
-    results = []  # 각 파일에 대한 추론 결과를 담을 리스트
-    for file in files:
+    validate_chord(chord)
+
+    media_type = (request.headers.get("content-type") or "").split(";")[0].strip().lower()
+    if files:
+        sources = (file.file.read() for file in files)
+    elif media_type in FORM_MEDIA_TYPES:
+        # 폼 본문은 FastAPI가 이미 읽었으므로 본문을 다시 읽지 않고 files 누락으로 응답
+        raise HTTPException(status_code=422, detail="Field 'files' is required")
+    else:
+        # 임시 파일 없이 본문을 memoryview 조각으로 나눠 바로 imdecode
+        body = await request.body()
         try:
-            file_bytes = file.file.read()
-            np_arr = np.frombuffer(file_bytes, np.uint8)
-            frame = cv2.imdecode(np_arr, cv2.IMREAD_COLOR)
-            if frame is None:
-                raise ValueError("Failed to decode image")
-        except Exception as e:
-            logger.exception("이미지 디코딩 오류")
-            raise HTTPException(status_code=400, detail="Failed to decode image")
-        
-        result = tracker.process_frame(frame)
-        print(result)
-        results.append(result)
+            sources = split_burst(body, request.headers.get("content-type"))
+        except ValueError as e:
+            logger.exception("버스트 본문 파싱 오류")
+            raise HTTPException(status_code=400, detail=str(e))
+    # 추론은 블로킹이므로 스레드풀에서 실행
+    return await run_in_threadpool(run_tracking, tracker, sources, chord)
+
+def run_tracking(tracker, sources, chord: Optional[str]):
+    results = []  # 각 파일에 대한 추론 결과를 담을 리스트
+    try:
+        # decode → YOLO/Mediapipe(동시) → 상태 갱신을 프레임 간에 겹쳐서 처리
+        for result in tracker.process_stream(sources, decode_image):
+            print(result)
+            results.append(result)
+    except (ValueError, cv2.error) as e:
+        logger.exception("이미지 디코딩 오류")
+        raise HTTPException(status_code=400, detail="Failed to decode image")
+    persist_calibration(tracker)
     
     # 여러 결과 중에서 overall detection_done은 하나라도 True면 True로 처리
     overall_detection = any(r.get("detection_done", False) for r in results)
@@ -128,10 +190,48 @@ def tracking(
     logger.info("** tracking API **")
     logger.info(f"detection_done: {overall_detection}")
     logger.info(f"finger_positions: {aggregated_positions}")
-    return {
+    response = {
         "detection_done": overall_detection,
         "finger_positions": aggregated_positions
     }
+    if chord is not None:
+        # 판정/오차는 집계 결과 기준, confident는 그 판정 아래 프레임 자체로도 일치한 프레임 수만큼만 누적
+        # (손이 안 잡힌 프레임이나 다른 운지 프레임은 연속 일치로 세지 않음)
+        chord_match = match_chord(chord, aggregated_positions)
+        matched_frames = sum(1 for r in results if chord_matches(chord, r.get("finger_positions", {})))
+        chord_match["confident"] = update_chord_streak(tracker, chord, chord_match["matched"], matched_frames)
+        response["chord_match"] = chord_match
+    return response
+
+# 녹화 영상 분석용 (프레임별 결과를 NDJSON으로 스트리밍)
+@api_router.post("/video/{session_id}")
+def analyze_video_file(
+    session_id: str = Path(...),
+    file: UploadFile = File(...),
+    sample_fps: float = Query(VIDEO_SAMPLE_FPS, gt=0),
+    batch_size: int = Query(VIDEO_BATCH_SIZE, ge=1, le=64)
+):
+    tracker = get_session(session_id)
+    if tracker is None:
+        raise HTTPException(status_code=400, detail="Invalid session_id")
+
+    suffix = os.path.splitext(file.filename or "")[1] or ".mp4"
+    video_path = spool_upload_to_disk(file, suffix)
+    if not can_open_video(video_path):
+        os.remove(video_path)
+        raise HTTPException(status_code=400, detail="Failed to decode video")
+
+    logger.info("** video API **")
+    # 응답이 끝나거나 클라이언트가 끊긴 뒤 실행: 임시 파일 삭제, 처리 중 집계 해제, 검출 결과 저장
+    start_video_analysis()
+    cleanup = BackgroundTasks()
+    cleanup.add_task(finish_video_analysis, video_path)
+    cleanup.add_task(persist_calibration, tracker)
+    return StreamingResponse(
+        analyze_video(tracker, video_path, sample_fps, batch_size),
+        media_type="application/x-ndjson",
+        background=cleanup
+    )
 
 @api_router.post("/stop/{session_id}")
 def stop_session(
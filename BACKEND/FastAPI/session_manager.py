@@ -1,17 +1,37 @@
 # session_manager.py
 import uuid
+from typing import Optional
 from inference import GuitarTracker
+from calibration_store import save_calibration, load_calibration
 
 # 전역 세션 저장소 – 각 세션별로 GuitarTracker 인스턴스가 저장됩니다.
 SESSION_DATA = {}
 
-def create_session() -> str:
+def create_session(device_token: Optional[str] = None) -> str:
     session_id = str(uuid.uuid4())
-    SESSION_DATA[session_id] = GuitarTracker()
+    tracker = GuitarTracker(device_token=device_token)
+    # 같은 기기/사용자의 이전 캘리브레이션이 있으면 빠른 재고정 경로 사용
+    snapshot = load_calibration(device_token)
+    if snapshot is not None:
+        tracker.load_calibration(snapshot)
+    SESSION_DATA[session_id] = tracker
     return session_id
 
 def get_session(session_id: str):
     return SESSION_DATA.get(session_id)
 
+def persist_calibration(tracker: GuitarTracker, force: bool = False) -> None:
+    # 새로 검출이 완료된 경우(또는 force)에만 스냅샷 저장
+    if not tracker.device_token:
+        return
+    if tracker.calibration_updated or force:
+        save_calibration(tracker.device_token, tracker.export_calibration())
+        tracker.calibration_updated = False
+
 def remove_session(session_id: str) -> None:
-    SESSION_DATA.pop(session_id, None)
+    tracker = SESSION_DATA.pop(session_id, None)
+    if tracker is not None:
+        # 종료 시점의 nut/far fret 박스까지 포함해 저장
+        persist_calibration(tracker, force=True)
+        # 파이프라인 워커 스레드와 Mediapipe 리소스 정리
+        tracker.close()
@@ -2,7 +2,10 @@
 import math
 import cv2
 import numpy as np
-from config import CLASS_NUT, CLASS_FRET, NUM_FRETS
+from config import (
+    CLASS_NUT, CLASS_FRET, NUM_FRETS,
+    FRETBOARD_TAPER, FRET_PRIOR_MAX_ERROR, FRET_PRIOR_MAX_DRIFT
+)
 
 def distance(p1, p2):
     return np.linalg.norm(np.array(p1) - np.array(p2))
@@ -34,11 +37,16 @@ def get_segmentation_masks(results):
         out.append((masks[i], cls_ids[i], scores[i]))
     return out
 
-def get_top_bottom_points(bin_mask):
+def largest_contour(bin_mask):
     cnts, _ = cv2.findContours(bin_mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
     if not cnts:
+        return None
+    return max(cnts, key=cv2.contourArea)
+
+def get_top_bottom_points(max_cnt):
+    # 후보 마스크의 가장 큰 외곽선에서 가장 위/아래 점
+    if max_cnt is None:
         return None, None
-    max_cnt = max(cnts, key=cv2.contourArea)
     min_y, max_y = 1e9, -1e9
     top_pt, bottom_pt = None, None
     for pt in max_cnt:
@@ -55,14 +63,13 @@ def select_topmost_nut(nut_candidates):
     best_nut = None
     best_top_y = None
     for nut in nut_candidates:
-        result = get_top_bottom_points(nut['bin'])
-        if result is None:
+        top_pt, _ = get_top_bottom_points(nut['cnt'])
+        if top_pt is None:
             continue
-        top_pt, _ = result
         if best_top_y is None or top_pt[1] < best_top_y:
             best_nut = nut
             best_top_y = top_pt[1]
-    return best_nut['bin'] if best_nut is not None else None
+    return best_nut['cnt'] if best_nut is not None else None
 
 def sort_frets_by_distance_from_nut(nut_lr, fret_list):
     nut_center = get_center(*nut_lr)
@@ -334,6 +341,102 @@ def interpolate_corners(corners_array, last_known, fret_geometry, far_fret_box=N
         last_known[i] = corners_array[i]
     return corners_array
 
+# --- 프렛 간격 물리 모델 (12평균율 + 원근 호모그래피) ---
+
+def fret_model_position(n):
+    # 너트(0)부터 n번 프렛까지의 거리 (스케일 길이 = 1)
+    return 1.0 - 2.0 ** (-n / 12.0)
+
+def fret_model_line(n):
+    # 지판 모델 좌표계에서 n번 프렛의 (top, bottom) – 폭은 바디 쪽으로 갈수록 넓어짐
+    x = fret_model_position(n)
+    return (x, 0.0), (x, 1.0 + FRETBOARD_TAPER * x)
+
+def fit_fretboard_homography(corners_array, min_frets):
+    """관측된 nut/프렛 (top, bottom)과 모델 좌표로 호모그래피를 최소자승 추정.
+    nut 포함, 프렛 min_frets개 이상 필요. 재투영 오차가 크면 None."""
+    if corners_array[0] is None:
+        return None
+    src, dst, centers = [], [], []
+    for i in range(NUM_FRETS+1):
+        if corners_array[i] is None:
+            continue
+        top, bot = corners_array[i]
+        m_top, m_bot = fret_model_line(i)
+        src += [m_top, m_bot]
+        dst += [top, bot]
+        centers.append(get_center(top, bot))
+    if len(centers) - 1 < min_frets:
+        return None
+    src = np.array(src, dtype=np.float32)
+    dst = np.array(dst, dtype=np.float32)
+    H, _ = cv2.findHomography(src, dst, 0)
+    if H is None:
+        return None
+    proj = cv2.perspectiveTransform(src.reshape(-1, 1, 2), H).reshape(-1, 2)
+    # 프렛 하나를 건너뛴 잘못된 번호 매김도 걸러지도록 평균 프렛 간격 대비로 평가
+    mean_gap = sum(distance(centers[k], centers[k+1]) for k in range(len(centers) - 1)) / (len(centers) - 1)
+    if mean_gap < 1e-5:
+        return None
+    err = np.linalg.norm(proj - dst, axis=1).mean() / mean_gap
+    if err > FRET_PRIOR_MAX_ERROR:
+        return None
+    return H
+
+def predict_fret_corners(H):
+    # 호모그래피로 전체 프렛(0..NUM_FRETS)의 (top, bottom)을 닫힌 형태로 계산
+    pts = []
+    for i in range(NUM_FRETS+1):
+        pts += list(fret_model_line(i))
+    proj = cv2.perspectiveTransform(np.array(pts, dtype=np.float32).reshape(-1, 1, 2), H).reshape(-1, 2)
+    return [(tuple(proj[2*i]), tuple(proj[2*i+1])) for i in range(NUM_FRETS+1)]
+
+def fill_corners_with_fret_prior(corners_array, min_frets):
+    # 관측되지 않은 프렛만 모델 예측값으로 채움. 모델 적합 실패 시 None
+    H = fit_fretboard_homography(corners_array, min_frets)
+    if H is None:
+        return None
+    predicted = predict_fret_corners(H)
+    return [corners_array[i] if corners_array[i] is not None else predicted[i] for i in range(NUM_FRETS+1)]
+
+def fit_frame_to_reference(corners_array, reference, min_frets, exclude=()):
+    """현재 프레임과 기준(고정 시점) 양쪽에 있는 nut/프렛 (top, bottom)으로 현재→기준 호모그래피 추정.
+    exclude 번호는 제외, 공통 프렛이 min_frets개 미만이거나 재투영 오차가 크면 None."""
+    src, dst, centers = [], [], []
+    for i in range(NUM_FRETS+1):
+        if i in exclude or corners_array[i] is None or reference[i] is None:
+            continue
+        src += list(corners_array[i])
+        dst += list(reference[i])
+        centers.append(get_center(*reference[i]))
+    if len(centers) - 1 < min_frets:
+        return None
+    src = np.array(src, dtype=np.float32)
+    dst = np.array(dst, dtype=np.float32)
+    H, _ = cv2.findHomography(src, dst, 0)
+    if H is None:
+        return None
+    proj = cv2.perspectiveTransform(src.reshape(-1, 1, 2), H).reshape(-1, 2)
+    mean_gap = sum(distance(centers[k], centers[k+1]) for k in range(len(centers) - 1)) / (len(centers) - 1)
+    if mean_gap < 1e-5 or np.linalg.norm(proj - dst, axis=1).mean() / mean_gap > FRET_PRIOR_MAX_ERROR:
+        return None
+    return H
+
+def transform_corner(H, corner):
+    top, bot = cv2.perspectiveTransform(np.array([corner], dtype=np.float32).reshape(-1, 1, 2), H).reshape(-1, 2)
+    return (tuple(top), tuple(bot))
+
+def fret_predictions_agree(corners_array, reference, indices):
+    # 예측으로 채운 프렛(indices)이 기준 위치에서 해당 칸 간격의 FRET_PRIOR_MAX_DRIFT 이내인지 확인
+    for i in indices:
+        if corners_array[i] is None or reference[i] is None or reference[i-1] is None:
+            continue
+        ref_center = get_center(*reference[i])
+        gap = distance(get_center(*reference[i-1]), ref_center)
+        if distance(get_center(*corners_array[i]), ref_center) > FRET_PRIOR_MAX_DRIFT * gap:
+            return False
+    return True
+
 def build_fretboard_polygons(corners_array):
     polys = [None]*NUM_FRETS
     for i in range(NUM_FRETS):
@@ -0,0 +1,89 @@
+# video_analysis.py
+import os
+import json
+import shutil
+import logging
+import tempfile
+import cv2
+from config import VIDEO_SAMPLE_FPS, VIDEO_BATCH_SIZE, VIDEO_UPLOAD_CHUNK
+from quality_controller import QUALITY_CONTROLLER
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SOURCE_FPS = 30.0
+
+def spool_upload_to_disk(upload_file, suffix: str = ".mp4") -> str:
+    # VideoCapture는 경로가 필요하므로 업로드를 청크 단위로 임시 파일에 복사 (메모리에 전체 적재 X)
+    tmp = tempfile.NamedTemporaryFile(delete=False, suffix=suffix)
+    with tmp:
+        shutil.copyfileobj(upload_file.file, tmp, VIDEO_UPLOAD_CHUNK)
+    return tmp.name
+
+def can_open_video(video_path: str) -> bool:
+    cap = cv2.VideoCapture(video_path)
+    opened = cap.isOpened()
+    cap.release()
+    return opened
+
+def iter_sampled_frames(video_path: str, sample_fps: float = VIDEO_SAMPLE_FPS):
+    """영상을 순차 디코딩하며 sample_fps 간격의 프레임만 (timestamp, frame)으로 반환.
+    건너뛰는 프레임은 grab()만 하고 retrieve()하지 않아 디코딩 비용을 줄인다."""
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise ValueError("Failed to open video")
+    try:
+        src_fps = cap.get(cv2.CAP_PROP_FPS) or DEFAULT_SOURCE_FPS
+        step = max(src_fps / sample_fps, 1.0) if sample_fps > 0 else 1.0
+        next_pick = 0.0
+        idx = 0
+        while cap.grab():
+            if idx >= next_pick:
+                ok, frame = cap.retrieve()
+                if ok and frame is not None:
+                    yield idx / src_fps, frame
+                next_pick += step
+            idx += 1
+    finally:
+        cap.release()
+
+def analyze_video(tracker, video_path: str, sample_fps: float = VIDEO_SAMPLE_FPS,
+                  batch_size: int = VIDEO_BATCH_SIZE):
+    """샘플링된 프레임을 batch_size 단위로 묶어 GuitarTracker 배치 추론에 넣고,
+    프레임별 결과를 NDJSON 한 줄씩 반환 (시간순 운지 타임라인)."""
+    timestamps, frames = [], []
+
+    def flush():
+        results = tracker.process_frames(frames)
+        lines = []
+        for ts, res in zip(timestamps, results):
+            lines.append(json.dumps({
+                "time": round(ts, 3),
+                "detection_done": res["detection_done"],
+                "finger_positions": res["finger_positions"],
+            }) + "\n")
+        timestamps.clear()
+        frames.clear()
+        return lines
+
+    # 임시 파일 삭제와 처리 중 요청 집계 해제는 응답 종료 후 finish_video_analysis에서 수행
+    # (클라이언트가 본문을 읽기 전에 끊어도 실행되도록 BackgroundTask로 연결)
+    try:
+        for ts, frame in iter_sampled_frames(video_path, sample_fps):
+            timestamps.append(ts)
+            frames.append(frame)
+            if len(frames) >= batch_size:
+                yield from flush()
+        if frames:
+            yield from flush()
+    except ValueError:
+        logger.exception("영상 디코딩 오류")
+        yield json.dumps({"error": "Failed to decode video"}) + "\n"
+
+def start_video_analysis():
+    # 스트리밍이 끝날 때까지 처리 중인 요청으로 집계
+    QUALITY_CONTROLLER.enter()
+
+def finish_video_analysis(video_path: str):
+    QUALITY_CONTROLLER.exit()
+    if os.path.exists(video_path):
+        os.remove(video_path)